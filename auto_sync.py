@@ -4,87 +4,336 @@ Auto-sync script for Trading Dashboard
 Automatically commits and pushes changes to GitHub
 """
 
-import subprocess
+import asyncio
+import threading
 import time
 import os
-from datetime import datetime
 
-def run_command(command):
-    """Run a shell command and return the result"""
+try:
+    import pathspec
+except ImportError:
+    pathspec = None
+
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+# Read-only git calls skip the optional index refresh (and its lock)
+READ_ONLY_ENV = {'GIT_OPTIONAL_LOCKS': '0'}
+
+# Upper bounds for a single git call, so a stalled push (network, credential
+# prompt) can't hang the watcher forever
+COMMAND_TIMEOUT = 60
+PUSH_TIMEOUT = 120
+
+# Sync commits skip fsync and the automatic `git gc` that a commit can start;
+# `git gc --auto` runs every GC_INTERVAL seconds instead. Only meant for a
+# dev-machine working tree: a crash can lose the newest local commits (the
+# files themselves are untouched and get picked up by the next sync).
+FAST_COMMIT_CONFIG = ['-c', 'core.fsync=none', '-c', 'gc.auto=0']
+GC_INTERVAL = 3600
+
+# Commit message template, filled with a `%Y-%m-%d %H:%M:%S` timestamp and
+# piped to `git commit -F -`
+COMMIT_MESSAGE = b"Auto-sync: Update trading dashboard - %s"
+
+# Paths per `git add` call, to stay well under the OS argument length limit
+ADD_CHUNK_SIZE = 1000
+
+# Fast path for idle ticks: skip `git status` while neither the working tree
+# (per file system events) nor the index (per its mtime) has changed.
+_observer = None
+_tree_dirty = threading.Event()
+_last_index_mtime = 0
+# Absolute path of the index, resolved once by resolve_index_path() (works
+# from subdirectories and linked worktrees); the fast path is off without it
+_index_path = None
+
+# Changes git won't report must not mark the tree dirty, or a running
+# dashboard (SQLite writes, __pycache__) keeps the fast path from ever
+# kicking in. Matched as whole path components when pathspec is missing;
+# .gitignore lists the same names.
+IGNORE_NAMES = frozenset({
+    '.git', '__pycache__', 'node_modules', '.env',
+    'trading_dashboard.db', '.kiro', '.vscode'
+})
+_gitignore = None
+
+# In-process libgit2 repository, reused across ticks (None without pygit2)
+_repo = None
+
+
+def load_gitignore():
+    """Compile the top-level .gitignore, if pathspec is installed"""
+    global _gitignore
+    if pathspec is None:
+        return
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        return result.returncode == 0, result.stdout, result.stderr
+        with open('.gitignore') as f:
+            _gitignore = pathspec.GitIgnoreSpec.from_lines(f)
+    except OSError:
+        _gitignore = None
+
+def is_ignored(path):
+    """Check whether git ignores a path reported by the observer"""
+    rel_path = os.path.relpath(path).replace(os.sep, '/')
+    if any(part in IGNORE_NAMES for part in rel_path.split('/')):
+        return True
+    return _gitignore is not None and _gitignore.match_file(rel_path)
+
+
+class DirtyFlagHandler(FileSystemEventHandler):
+    """Mark the working tree dirty on any change git would see"""
+    
+    def on_any_event(self, event):
+        if event.event_type not in ('created', 'modified', 'deleted', 'moved'):
+            return
+        if event.is_directory and event.event_type == 'modified':
+            return  # Only says an entry changed; the entry's own event follows
+        paths = [p for p in (event.src_path, getattr(event, 'dest_path', '')) if p]
+        if os.path.basename(paths[-1]) == '.gitignore':
+            load_gitignore()
+        if any(not is_ignored(p) for p in paths):
+            _tree_dirty.set()
+
+
+def start_change_observer():
+    """Start watching the working tree so idle checks can skip git status"""
+    global _observer
+    if Observer is None:
+        return
+    load_gitignore()
+    try:
+        observer = Observer()
+        observer.schedule(DirtyFlagHandler(), '.', recursive=True)
+        observer.start()
+    except OSError as e:
+        print(f"⚠️  File watching unavailable ({e}), running git status every check")
+        return
+    _observer = observer
+    _tree_dirty.set()  # Changes made before the observer started are unknown
+
+async def resolve_index_path():
+    """Locate the git index of this working tree"""
+    global _index_path
+    repo = open_repo()
+    if repo is not None:
+        _index_path = os.path.join(repo.path, 'index')
+        return
+    success, output, error = await run_command(['git', 'rev-parse', '--git-path', 'index'])
+    if success:
+        _index_path = os.path.abspath(os.fsdecode(output.strip()))
+
+def index_mtime():
+    """Modification time of the git index, 0 if it can't be read"""
+    try:
+        return os.stat(_index_path).st_mtime_ns
+    except (OSError, TypeError):
+        return 0
+
+def command_name(args):
+    """Short name of a command for messages, e.g. `git commit` (skips `-c` and other options)"""
+    words = iter(args[1:])
+    for word in words:
+        if word == '-c':
+            next(words, None)
+        elif not word.startswith('-'):
+            return f"{args[0]} {word}"
+    return args[0]
+
+async def run_command(args, env=None, timeout=COMMAND_TIMEOUT, cwd=None, input=None):
+    """Run a command (argv list, no shell) and return the result"""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            stdin=asyncio.subprocess.PIPE if input is not None else None,
+            env=env and {**os.environ, **env}, cwd=cwd
+        )
     except Exception as e:
-        return False, "", str(e)
+        return False, b"", str(e).encode()
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(input), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return False, b"", f"{command_name(args)} timed out after {timeout}s".encode()
+    # Output stays bytes; only decode what gets printed
+    return proc.returncode == 0, stdout, stderr
 
-def check_git_changes():
-    """Check if there are any changes to commit"""
-    success, output, error = run_command("git status --porcelain")
-    return success and output.strip() != ""
+def open_repo():
+    """Open the repository with pygit2 once, if it is installed"""
+    global _repo
+    if _repo is None and pygit2 is not None:
+        try:
+            _repo = pygit2.Repository('.')
+        except pygit2.GitError:
+            pass
+    return _repo
+
+def parse_porcelain(output):
+    """Changed paths from `git status --porcelain -z` output"""
+    paths = set()
+    entries = iter(output.split(b'\0'))
+    for entry in entries:
+        if not entry:
+            continue
+        paths.add(os.fsdecode(entry[3:]))
+        if entry[:1] in (b'R', b'C'):
+            paths.add(os.fsdecode(next(entries, b'')))  # Rename/copy source
+    paths.discard('')
+    return paths
+
+async def git_changed_paths():
+    """Paths with staged or unstaged changes, relative to the repo root
+    
+    Returns None if the status could not be read.
+    """
+    repo = open_repo()
+    if repo is not None:
+        try:
+            return {path for path, flags in repo.status().items()
+                    if flags & ~pygit2.GIT_STATUS_IGNORED}
+        except pygit2.GitError as e:
+            print(f"⚠️  pygit2 status failed ({e}), falling back to git status")
+    
+    success, output, error = await run_command(['git', 'status', '--porcelain', '-z'], READ_ONLY_ENV)
+    return parse_porcelain(output) if success else None
+
+async def repo_root():
+    """Top-level directory of the working tree (status paths are relative to it)"""
+    repo = open_repo()
+    if repo is not None and repo.workdir:
+        return repo.workdir
+    success, output, error = await run_command(['git', 'rev-parse', '--show-toplevel'])
+    return os.fsdecode(output.strip()) if success else '.'
 
-def auto_commit_and_push():
+async def check_git_changes():
+    """Return the set of changed paths (empty if there is nothing to commit)"""
+    global _last_index_mtime
+    if (_observer is not None and _index_path is not None
+            and not _tree_dirty.is_set() and index_mtime() == _last_index_mtime):
+        return set()
+    
+    _tree_dirty.clear()
+    changed = await git_changed_paths()
+    # Read the index mtime after the status call; while changes are
+    # pending, force a full check on the next tick
+    _last_index_mtime = 0 if changed or changed is None else index_mtime()
+    return changed or set()
+
+async def auto_commit_and_push():
     """Automatically commit and push changes"""
-    if not check_git_changes():
+    changed = await check_git_changes()
+    if not changed:
         print("✅ No changes detected")
         return True
     
-    print("📝 Changes detected, committing...")
-    
-    # Add all changes
-    success, output, error = run_command("git add .")
-    if not success:
-        print(f"❌ Failed to add changes: {error}")
-        return False
+    return await commit_and_push(changed)
+
+async def commit_and_push(changed):
+    """Commit and push the paths found by check_git_changes"""
+    print(f"📝 {len(changed)} changed file(s) detected, committing...")
     
-    # Commit with timestamp
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    commit_message = f"Auto-sync: Update trading dashboard - {timestamp}"
+    # Stage only the changed paths instead of rescanning the tree with `git add .`;
+    # --all also stages deletions
+    root = await repo_root()
+    paths = sorted(changed)
+    for i in range(0, len(paths), ADD_CHUNK_SIZE):
+        success, output, error = await run_command(
+            ['git', *FAST_COMMIT_CONFIG, '--literal-pathspecs', 'add', '--all', '--',
+             *paths[i:i + ADD_CHUNK_SIZE]],
+            cwd=root
+        )
+        if not success:
+            print(f"❌ Failed to add changes: {error.decode(errors='replace')}")
+            return False
     
-    success, output, error = run_command(f'git commit -m "{commit_message}"')
+    # Commit with timestamp; the message goes over stdin
+    commit_message = COMMIT_MESSAGE % time.strftime("%Y-%m-%d %H:%M:%S").encode()
+    success, output, error = await run_command(['git', *FAST_COMMIT_CONFIG, 'commit', '-F', '-'],
+                                               input=commit_message)
     if not success:
-        print(f"❌ Failed to commit: {error}")
+        print(f"❌ Failed to commit: {error.decode(errors='replace')}")
         return False
     
     # Push to GitHub
     print("🚀 Pushing to GitHub...")
-    success, output, error = run_command("git push origin main")
+    success, output, error = await run_command(['git', 'push', 'origin', 'main'],
+                                               timeout=PUSH_TIMEOUT)
     if not success:
-        print(f"❌ Failed to push: {error}")
+        print(f"❌ Failed to push: {error.decode(errors='replace')}")
         return False
     
     print("✅ Successfully synced to GitHub!")
     return True
 
-def watch_and_sync(interval=30):
-    """Watch for changes and auto-sync every interval seconds"""
-    print(f"🔄 Auto-sync started - checking every {interval} seconds")
+async def watch_and_sync(min_interval=30, max_interval=300):
+    """Watch for changes and auto-sync, backing off while the tree is idle
+    
+    The wait doubles after every check that finds nothing (up to
+    max_interval) and drops back to min_interval as soon as a change is seen.
+    """
+    max_interval = max(min_interval, max_interval)
+    print(f"🔄 Auto-sync started - checking every {min_interval}-{max_interval} seconds")
     print("📁 Watching directory:", os.getcwd())
     print("🔗 GitHub repository: https://github.com/Sourabhsingh28bais/ai-trading-dashboardd")
     print("⏹️  Press Ctrl+C to stop\n")
     
+    interval = min_interval
+    last_gc = time.monotonic()
+    await resolve_index_path()
+    start_change_observer()
     try:
         while True:
-            auto_commit_and_push()
-            time.sleep(interval)
-    except KeyboardInterrupt:
-        print("\n⏹️  Auto-sync stopped")
+            if time.monotonic() - last_gc >= GC_INTERVAL:
+                last_gc = time.monotonic()
+                await run_command(['git', 'gc', '--auto', '--quiet'], timeout=PUSH_TIMEOUT)
+            changed = await check_git_changes()
+            if changed:
+                await commit_and_push(changed)
+                interval = min_interval
+            else:
+                interval = min(interval * 2, max_interval)
+                print(f"✅ No changes detected (next check in {interval}s)")
+            await asyncio.sleep(interval)
+    finally:
+        if _observer is not None:
+            _observer.stop()
+            _observer.join()
 
-if __name__ == "__main__":
-    import sys
-    
-    if len(sys.argv) > 1:
-        try:
-            interval = int(sys.argv[1])
-        except ValueError:
-            print("❌ Invalid interval. Using default 30 seconds.")
-            interval = 30
-    else:
-        interval = 30
-    
+async def main(min_interval, max_interval):
     # Initial sync
     print("🚀 Starting Auto-Sync for Trading Dashboard")
     print("=" * 50)
-    auto_commit_and_push()
+    await auto_commit_and_push()
     
     # Start watching
-    watch_and_sync(interval)
\ No newline at end of file
+    await watch_and_sync(min_interval, max_interval)
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Auto-sync the trading dashboard to GitHub")
+    parser.add_argument("interval", nargs="?", type=int,
+                        help="Shortest wait between checks in seconds (same as --min)")
+    parser.add_argument("--min", dest="min_interval", type=int, default=30,
+                        help="Shortest wait between checks, used while changes keep coming (default: 30)")
+    parser.add_argument("--max", dest="max_interval", type=int, default=300,
+                        help="Longest wait between checks while the tree is idle (default: 300)")
+    args = parser.parse_args()
+    min_interval = args.interval if args.interval is not None else args.min_interval
+    if min(min_interval, args.max_interval) < 1:
+        parser.error("intervals must be at least 1 second")
+    
+    try:
+        asyncio.run(main(min_interval, args.max_interval))
+    except KeyboardInterrupt:
+        print("\n⏹️  Auto-sync stopped")
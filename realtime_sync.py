@@ -4,129 +4,731 @@ Real-time file watcher for automatic GitHub sync
 Watches for file changes and immediately syncs to GitHub
 """
 
+import hashlib
+import json
 import os
+import queue
+import re
 import time
 import subprocess
-from datetime import datetime
-from pathlib import Path
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    from watchdog.observers.polling import PollingObserver
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = PollingObserver = None
+
+# Event types that mean file contents or paths changed (skip opened/closed)
+CHANGE_EVENTS = {'created', 'modified', 'deleted', 'moved'}
+
+# Content fingerprints survive restarts in this file (relative to the watched dir)
+HASHES_FILE = '.sync_hashes'
+# Upper bounds for a single git call, as in auto_sync.py: a stalled push
+# (network, credential prompt) would otherwise block the only git worker
+COMMAND_TIMEOUT = 60
+PUSH_TIMEOUT = 120
+
+# Same fast-commit settings as auto_sync.py (see the trade-off noted there)
+FAST_COMMIT_CONFIG = ['-c', 'core.fsync=none', '-c', 'gc.auto=0']
+GC_INTERVAL = 3600
+
+# Commit message template (file count, `%Y-%m-%d %H:%M:%S` timestamp),
+# piped to `git commit -F -`
+COMMIT_MESSAGE = b"Real-time sync: %d files updated - %s"
+
+# Paths per `git ls-files` call, to stay well under the OS argument length limit
+PATHSPEC_CHUNK_SIZE = 1000
+
+# mtime slot for paths that are unknown or currently missing
+MISSING = -1
+# Files at least this big are fingerprinted from a head/tail sample
+LARGE_FILE_SIZE = 1 << 20
+SAMPLE_SIZE = 4096
+
+
+def new_hasher():
+    """64-bit hasher: xxh3 when available, blake2b otherwise"""
+    if xxhash is not None:
+        return xxhash.xxh3_64()
+    return hashlib.blake2b(digest_size=8)
+
+
+def command_name(args):
+    """Short name of a command for messages, e.g. `git commit` (skips `-c` and other options)"""
+    words = iter(args[1:])
+    for word in words:
+        if word == '-c':
+            next(words, None)
+        elif not word.startswith('-'):
+            return f"{args[0]} {word}"
+    return args[0]
+
+
+def file_digest(path):
+    """64-bit fingerprint of a file's content
+    
+    Small files are hashed in full with a plain read. Large files (DB files,
+    model weights) only hash their first and last SAMPLE_SIZE bytes plus size
+    and mtime, so they never have to be read end to end; the mtime keeps
+    in-place edits in the middle from being missed. No mmap: a file truncated
+    under the mapping raises SIGBUS, and on Windows an open mapping blocks
+    editors from replacing the file.
+    """
+    hasher = new_hasher()
+    with open(path, 'rb', buffering=0) as f:
+        st = os.fstat(f.fileno())
+        if st.st_size < LARGE_FILE_SIZE:
+            hasher.update(f.read())
+        else:
+            hasher.update(f.read(SAMPLE_SIZE))
+            f.seek(-SAMPLE_SIZE, os.SEEK_END)
+            hasher.update(f.read(SAMPLE_SIZE))
+            hasher.update(st.st_size.to_bytes(8, 'little'))
+            hasher.update(st.st_mtime_ns.to_bytes(8, 'little'))
+    return int.from_bytes(hasher.digest(), 'big')
+
+
+class ChangeHandler(FileSystemEventHandler):
+    """Forward file system events to the watcher's event queue"""
+    
+    def __init__(self, watcher):
+        super().__init__()
+        self.watcher = watcher
+    
+    def on_any_event(self, event):
+        if event.event_type not in CHANGE_EVENTS:
+            return
+        if event.is_directory and event.event_type == 'modified':
+            return  # Only says an entry changed; the entry's own event follows
+        for path in (event.src_path, getattr(event, 'dest_path', '')):
+            if not path:
+                continue
+            rel_path = self.watcher.relative_path(path)
+            if event.is_directory:
+                # A directory moved or deleted as a whole may be the only event
+                # for the files under it; commit_locally expands it
+                rel_path += '/'
+            if not self.watcher.should_ignore(rel_path):
+                self.watcher.events.put(rel_path)
+
 
 class FileWatcher:
     def __init__(self, watch_directory="."):
-        self.watch_directory = Path(watch_directory)
-        self.last_modified = {}
-        self.ignore_patterns = {
+        # Plain str paths throughout: no Path objects in the per-file hot paths
+        self.watch_directory = os.path.abspath(watch_directory)
+        self._root_prefix = os.path.join(self.watch_directory, '')
+        self.events = queue.Queue()
+        self.pending = set()
+        self.debounce = 0.5  # Quiet period that ends a burst of events
+        self.max_wait = 5.0  # Upper bound on how long a burst can delay a sync
+        # Per-file state as parallel arrays indexed by an interned path id:
+        # mtimes (polling fallback only) and content hashes (0 = unknown).
+        # Arrays grow by doubling; only the first len(self.paths) slots are used.
+        self.path_idx = {}
+        self.paths = []
+        self.mtimes = np.empty(0, dtype=np.int64)
+        self.hashes = np.empty(0, dtype=np.uint64)
+        # self.hashes only holds digests of committed content; digests of
+        # changes still waiting to be committed live in unsynced. The worker
+        # records hashes while the watch loop interns paths, hence the lock.
+        self.unsynced = {}
+        self._state_lock = threading.RLock()
+        self.load_hashes()
+        # Group commit: push after push_every local commits, or push_interval
+        # seconds after the last push, whichever comes first
+        self.push_every = 5
+        self.push_interval = 30.0
+        self.unpushed_commits = 0
+        self.last_push = time.monotonic()
+        self.last_gc = time.monotonic()
+        self._push_timer = None
+        # All git work runs on one background worker so the watch loop keeps
+        # draining events during slow pushes; at most one batch is in flight
+        # and anything arriving meanwhile is coalesced into the next one
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.inflight = None
+        self.queued = {}  # path -> content digest (None for deletions/dirs)
+        self._queue_lock = threading.Lock()
+        # Batches that fail to commit go back into queued and are retried
+        # with exponential backoff (or sooner, with the next batch). A path
+        # that keeps failing is given up after max_attempts, so it can't hold
+        # back the changes merged in with it.
+        self.min_retry_delay = 2.0
+        self.max_retry_delay = 60.0
+        self.retry_delay = self.min_retry_delay
+        self.max_attempts = 5
+        self.failed_attempts = {}
+        self._retry_timer = None
+        self._closing = False  # Set by shutdown(); no new retries after that
+        self.ignore_patterns = frozenset({
             '.git', '__pycache__', 'node_modules', '.env', 
-            'trading_dashboard.db', '.kiro', '.vscode'
-        }
+            'trading_dashboard.db', '.kiro', '.vscode', HASHES_FILE
+        })
+        self._ignore_re = re.compile(
+            '(?:^|/)(?:' + '|'.join(map(re.escape, sorted(self.ignore_patterns))) + ')(?:/|$)'
+        )
         
     def should_ignore(self, file_path):
-        """Check if file should be ignored"""
-        path_str = str(file_path)
-        return any(pattern in path_str for pattern in self.ignore_patterns)
-    
-    def get_file_times(self):
-        """Get modification times for all files"""
-        file_times = {}
-        for file_path in self.watch_directory.rglob('*'):
-            if file_path.is_file() and not self.should_ignore(file_path):
-                try:
-                    file_times[str(file_path)] = file_path.stat().st_mtime
-                except (OSError, PermissionError):
+        """Check if a relative path is ignored by name
+        
+        Only the fixed ignore_patterns; git's own ignore rules are applied
+        by drop_gitignored() and the `git ls-files` calls.
+        """
+        return bool(self._ignore_re.search(file_path))
+    
+    def drop_gitignored(self, paths):
+        """Remove the paths git ignores (any .gitignore, info/exclude, global excludes)
+        
+        Tracked files are never dropped, even if an ignore pattern matches.
+        Everything is kept if git can't be asked.
+        """
+        if not paths:
+            return
+        success, output, error = self.run_git_command(
+            'check-ignore', '--stdin', '-z',
+            input=b''.join(os.fsencode(p) + b'\0' for p in paths)
+        )
+        # Exit status 1 with no error output just means nothing is ignored
+        if not success and error:
+            print(f"⚠️  git check-ignore failed: {error.decode(errors='replace')}")
+            return
+        paths.difference_update(map(os.fsdecode, output.split(b'\0')))
+    
+    def intern_path(self, rel_path):
+        """Return the array slot for a path, allocating one if it's new"""
+        with self._state_lock:
+            idx = self.path_idx.get(rel_path)
+            if idx is None:
+                idx = len(self.paths)
+                self.path_idx[rel_path] = idx
+                self.paths.append(rel_path)
+                if idx >= len(self.mtimes):
+                    grow = max(64, len(self.mtimes))
+                    self.mtimes = np.concatenate([self.mtimes, np.full(grow, MISSING, dtype=np.int64)])
+                    self.hashes = np.concatenate([self.hashes, np.zeros(grow, dtype=np.uint64)])
+            return idx
+    
+    def compact_paths(self):
+        """Free the slots of paths that are gone, once they make up half the arrays
+        
+        A slot is dead when its file is missing (or never polled), its
+        committed hash is 0 and no change to it is pending. Editor and
+        atomic-save temp files leave exactly such slots behind.
+        """
+        with self._state_lock:
+            count = len(self.paths)
+            live = (self.mtimes[:count] != MISSING) | (self.hashes[:count] != 0)
+            for rel_path in self.unsynced:
+                live[self.path_idx[rel_path]] = True
+            keep = np.flatnonzero(live)
+            if count < 64 or len(keep) * 2 > count:
+                return
+            size = max(64, 2 * len(keep))
+            self.paths = [self.paths[i] for i in keep]
+            self.path_idx = {rel_path: i for i, rel_path in enumerate(self.paths)}
+            mtimes = np.full(size, MISSING, dtype=np.int64)
+            mtimes[:len(keep)] = self.mtimes[keep]
+            hashes = np.zeros(size, dtype=np.uint64)
+            hashes[:len(keep)] = self.hashes[keep]
+            self.mtimes, self.hashes = mtimes, hashes
+    
+    def load_hashes(self):
+        """Load content hashes saved by a previous run"""
+        try:
+            with open(os.path.join(self.watch_directory, HASHES_FILE)) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        for rel_path, digest in saved.items():
+            idx = self.intern_path(rel_path)
+            self.hashes[idx] = digest
+    
+    def save_hashes(self):
+        """Persist content hashes so a restart doesn't re-sync unchanged files"""
+        path = os.path.join(self.watch_directory, HASHES_FILE)
+        with self._state_lock:
+            known = np.flatnonzero(self.hashes[:len(self.paths)])
+            saved = {self.paths[i]: int(self.hashes[i]) for i in known}
+        try:
+            with open(path + '.tmp', 'w') as f:
+                json.dump(saved, f)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"⚠️  Could not save {HASHES_FILE}: {e}")
+    
+    def check_content(self, rel_path):
+        """Compare a file's content with its last known hash
+        
+        Returns (changed, digest); touch and no-op saves aren't changes. The
+        digest is only remembered as committed once record_synced() runs.
+        """
+        if rel_path.endswith('/'):
+            return True, None  # Directory event, expanded to files when staged
+        try:
+            digest = file_digest(os.path.join(self.watch_directory, rel_path))
+        except OSError:
+            # Deleted or unreadable: let git decide
+            digest = None
+        with self._state_lock:
+            idx = self.intern_path(rel_path)
+            if rel_path in self.unsynced:
+                expected = self.unsynced[rel_path]
+            else:
+                expected = int(self.hashes[idx]) or None
+            if digest is not None and digest == expected:
+                return False, digest
+            self.unsynced[rel_path] = digest
+            return True, digest
+    
+    def record_synced(self, batch):
+        """Store the digests of a committed batch as the new baseline"""
+        with self._state_lock:
+            for rel_path, digest in batch.items():
+                if rel_path.endswith('/'):
                     continue
+                idx = self.intern_path(rel_path)
+                self.hashes[idx] = digest or 0
+                if rel_path in self.unsynced and self.unsynced[rel_path] == digest:
+                    del self.unsynced[rel_path]
+    
+    def forget_unsynced(self, batch):
+        """Forget pending digests of a batch that was given up on
+        
+        The files then compare against their last committed content again,
+        so the next change to them is picked up.
+        """
+        with self._state_lock:
+            for rel_path, digest in batch.items():
+                if rel_path in self.unsynced and self.unsynced[rel_path] == digest:
+                    del self.unsynced[rel_path]
+    
+    def relative_path(self, path):
+        """Path relative to the watched directory, with forward slashes"""
+        if path.startswith(self._root_prefix):
+            rel_path = path[len(self._root_prefix):]
+        else:
+            rel_path = os.path.relpath(path, self.watch_directory)
+        return rel_path.replace(os.sep, '/')
+    
+    def iter_file_times(self):
+        """List (relative path, mtime ns) for every file git would see
+        
+        `git ls-files` applies all of git's ignore rules and never enters
+        ignored directories or nested repositories. Returns None if git
+        fails, so a broken call isn't mistaken for every file vanishing.
+        """
+        success, output, error = self.run_git_command(
+            'ls-files', '-z', '--cached', '--others', '--exclude-standard'
+        )
+        if not success:
+            print(f"⚠️  git ls-files failed: {error.decode(errors='replace')}")
+            return None
+        file_times = []
+        for rel_path in dict.fromkeys(map(os.fsdecode, output.split(b'\0'))):
+            if not rel_path or rel_path.endswith('/') or self.should_ignore(rel_path):
+                continue  # '/' marks a nested repository
+            try:
+                # Tracked files that were deleted just drop out here
+                st = os.lstat(os.path.join(self.watch_directory, rel_path))
+            except OSError:
+                continue
+            file_times.append((rel_path, st.st_mtime_ns))
         return file_times
     
-    def run_git_command(self, command):
-        """Run git command"""
+    def scan_changes(self):
+        """List the tree and return paths whose mtime changed, appeared or vanished
+        
+        Fresh mtimes are written into an array aligned with self.mtimes, so the
+        diff is one vectorized comparison; files that disappeared keep the
+        MISSING value and compare unequal to their last known mtime.
+        """
+        file_times = self.iter_file_times()
+        if file_times is None:
+            return []
+        count = len(self.paths)
+        current = np.full(count, MISSING, dtype=np.int64)
+        new_files = []
+        for file_path, mod_time in file_times:
+            idx = self.path_idx.get(file_path)
+            if idx is None:
+                new_files.append((file_path, mod_time))
+            else:
+                current[idx] = mod_time
+        
+        changed = np.flatnonzero(current != self.mtimes[:count])
+        self.mtimes[:count] = current
+        changed_files = [self.paths[i] for i in changed]
+        
+        for file_path, mod_time in new_files:
+            idx = self.intern_path(file_path)
+            self.mtimes[idx] = mod_time
+            changed_files.append(file_path)
+        
+        return changed_files
+    
+    def run_git_command(self, *args, input=None, timeout=COMMAND_TIMEOUT):
+        """Run a git command in the watched directory (argv list, no shell)"""
+        argv = ['git', *args]
         try:
-            result = subprocess.run(command, shell=True, capture_output=True, text=True)
+            result = subprocess.run(argv, cwd=self.watch_directory, input=input,
+                                    capture_output=True, timeout=timeout)
+            # Output stays bytes; only decode what gets printed
             return result.returncode == 0, result.stdout, result.stderr
+        except subprocess.TimeoutExpired:
+            return False, b"", f"{command_name(argv)} timed out after {timeout}s".encode()
         except Exception as e:
-            return False, "", str(e)
+            return False, b"", str(e).encode()
+    
+    def submit_sync(self, changes):
+        """Hand a batch ({path: digest}) to the git worker, or queue it if one is in flight"""
+        with self._queue_lock:
+            self.queued.update(changes)
+            if self.inflight is None:
+                self._submit_queued()
+    
+    def _submit_queued(self):
+        # Caller holds _queue_lock
+        batch, self.queued = self.queued, {}
+        try:
+            self.inflight = self.executor.submit(self._do_sync, batch)
+        except RuntimeError:
+            # Worker already shut down: put the batch back for shutdown()
+            self.queued = batch
+            raise
+    
+    def _do_sync(self, batch):
+        committed = False
+        dropped = {}
+        try:
+            committed = self.sync_to_github(sorted(batch))
+            if committed:
+                self.record_synced(batch)
+        finally:
+            with self._queue_lock:
+                if committed:
+                    for rel_path in batch:
+                        self.failed_attempts.pop(rel_path, None)
+                    self.retry_delay = self.min_retry_delay
+                    if self.queued:
+                        self._submit_queued()
+                    else:
+                        self.inflight = None
+                else:
+                    # Keep the batch for another attempt (newer digests queued
+                    # meanwhile win), except paths that failed too often
+                    for rel_path, digest in batch.items():
+                        attempts = self.failed_attempts.get(rel_path, 0) + 1
+                        if attempts >= self.max_attempts:
+                            self.failed_attempts.pop(rel_path, None)
+                            dropped[rel_path] = digest
+                        else:
+                            self.failed_attempts[rel_path] = attempts
+                            self.queued.setdefault(rel_path, digest)
+                    self.inflight = None
+                    if self.queued:
+                        self._schedule_retry()
+        if dropped:
+            self.forget_unsynced(dropped)
+            print(f"⚠️  Giving up on {len(dropped)} file(s) after {self.max_attempts} failed "
+                  f"attempts, see git status: {', '.join(sorted(dropped))}")
+    
+    def _schedule_retry(self):
+        # Caller holds _queue_lock
+        if self._retry_timer is not None or self._closing:
+            return  # Already scheduled, or shutdown() makes the last attempt
+        print(f"🔁 Retrying in {self.retry_delay:.0f}s")
+        self._retry_timer = threading.Timer(self.retry_delay, self._retry)
+        self._retry_timer.daemon = True
+        self._retry_timer.start()
+        self.retry_delay = min(self.retry_delay * 2, self.max_retry_delay)
+    
+    def _retry(self):
+        with self._queue_lock:
+            self._retry_timer = None
+            if self.inflight is None and self.queued:
+                try:
+                    self._submit_queued()
+                except RuntimeError:
+                    pass  # Worker already shut down; shutdown() retries once more
+    
+    def shutdown(self):
+        """Finish queued batches, stop the worker and push what's left"""
+        if self._push_timer is not None:
+            self._push_timer.cancel()
+        with self._queue_lock:
+            self._closing = True
+            if self._retry_timer is not None:
+                self._retry_timer.cancel()
+                self._retry_timer = None
+        while True:
+            with self._queue_lock:
+                future = self.inflight
+            if future is None:
+                break
+            try:
+                future.result()
+            except Exception as e:
+                print(f"❌ Sync failed: {e}")
+        self.executor.shutdown()
+        with self._queue_lock:
+            batch, self.queued = self.queued, {}
+        if batch:
+            if self.sync_to_github(sorted(batch)):
+                self.record_synced(batch)
+            else:
+                print(f"⚠️  {len(batch)} changed file(s) could not be committed, see git status")
+        self.flush_push()
+        self.save_hashes()
     
     def sync_to_github(self, changed_files):
-        """Sync changes to GitHub"""
+        """Commit changes locally and push once enough commits have piled up
+        
+        Returns False only if the commit failed; failed pushes are retried
+        separately through schedule_push.
+        """
+        if not self.commit_locally(changed_files):
+            return False
+        
+        if (self.unpushed_commits >= self.push_every or
+                time.monotonic() - self.last_push >= self.push_interval):
+            self.flush_push()
+        elif self.unpushed_commits:
+            self.schedule_push()
+        return True
+    
+    def commit_locally(self, changed_files):
+        """Stage and commit the changed files without touching the network"""
         print(f"\n🔄 Files changed: {len(changed_files)}")
         for file in changed_files[:5]:  # Show first 5 files
-            print(f"   📝 {file}")
+            if os.path.lexists(os.path.join(self.watch_directory, file)):
+                print(f"   📝 {file}")
+            else:
+                print(f"   📝 {file} (deleted)")
         if len(changed_files) > 5:
             print(f"   ... and {len(changed_files) - 5} more files")
         
-        # Add changes
-        success, output, error = self.run_git_command("git add .")
+        # Let git pick what to stage: tracked paths (also deleted ones) plus
+        # new files its ignore rules allow (nested .gitignore, info/exclude,
+        # core.excludesFile) and that aren't inside a nested repository.
+        # Directory events (trailing '/') expand to every such file under
+        # them, including ones that vanished with a moved/deleted dir.
+        paths = {}
+        for i in range(0, len(changed_files), PATHSPEC_CHUNK_SIZE):
+            success, output, error = self.run_git_command(
+                '--literal-pathspecs', 'ls-files', '-z', '--cached', '--others',
+                '--exclude-standard', '--', *changed_files[i:i + PATHSPEC_CHUNK_SIZE]
+            )
+            if not success:
+                print(f"❌ Failed to list changed files: {error.decode(errors='replace')}")
+                return False
+            paths.update(dict.fromkeys(p for p in map(os.fsdecode, output.split(b'\0'))
+                                       if p and not p.endswith('/') and not self.should_ignore(p)))
+        if not paths:
+            print("✅ No changes to commit")
+            return True
+        
+        # Stage exactly those paths in one git process; --remove drops
+        # paths that no longer exist, --replace lets a file take the place
+        # of a directory (or the other way round)
+        success, output, error = self.run_git_command(
+            *FAST_COMMIT_CONFIG, 'update-index', '--add', '--remove', '--replace', '-z', '--stdin',
+            input=b''.join(os.fsencode(p) + b'\0' for p in paths)
+        )
         if not success:
-            print(f"❌ Failed to add: {error}")
+            print(f"❌ Failed to add: {error.decode(errors='replace')}")
             return False
         
         # Commit
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        files_summary = f"{len(changed_files)} files"
-        commit_message = f"Real-time sync: {files_summary} updated - {timestamp}"
-        
-        success, output, error = self.run_git_command(f'git commit -m "{commit_message}"')
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S").encode()
+        commit_message = COMMIT_MESSAGE % (len(changed_files), timestamp)
+        success, output, error = self.run_git_command(*FAST_COMMIT_CONFIG, 'commit', '-F', '-',
+                                                      input=commit_message)
         if not success:
-            if "nothing to commit" in error:
+            if b"nothing to commit" in output + error:
                 print("✅ No changes to commit")
                 return True
-            print(f"❌ Failed to commit: {error}")
+            print(f"❌ Failed to commit: {error.decode(errors='replace')}")
             return False
         
-        # Push
-        print("🚀 Pushing to GitHub...")
-        success, output, error = self.run_git_command("git push origin main")
+        self.unpushed_commits += 1
+        print(f"💾 Committed locally ({self.unpushed_commits} unpushed)")
+        return True
+    
+    def schedule_push(self):
+        """Make sure unpushed commits go out within push_interval seconds"""
+        if self._push_timer is None:
+            self._push_timer = threading.Timer(self.push_interval, self._submit_push)
+            self._push_timer.daemon = True
+            self._push_timer.start()
+    
+    def _submit_push(self):
+        try:
+            self.executor.submit(self.flush_push)
+        except RuntimeError:
+            pass  # Worker already shut down; shutdown() flushes instead
+    
+    def flush_push(self):
+        """Push all local commits in a single git push"""
+        if self._push_timer is not None:
+            self._push_timer.cancel()
+            self._push_timer = None
+        if not self.unpushed_commits:
+            return True
+        
+        print(f"🚀 Pushing {self.unpushed_commits} commit(s) to GitHub...")
+        success, output, error = self.run_git_command('push', 'origin', 'main',
+                                                      timeout=PUSH_TIMEOUT)
+        self.last_push = time.monotonic()
         if not success:
-            print(f"❌ Failed to push: {error}")
+            print(f"❌ Failed to push: {error.decode(errors='replace')}")
+            self.schedule_push()  # Retry later
             return False
         
+        self.unpushed_commits = 0
         print("✅ Successfully synced to GitHub!")
+        self.maybe_gc()
         return True
     
-    def watch(self, check_interval=5):
+    def maybe_gc(self):
+        """Run `git gc --auto` at most once per GC_INTERVAL"""
+        if time.monotonic() - self.last_gc < GC_INTERVAL:
+            return
+        self.last_gc = time.monotonic()
+        success, output, error = self.run_git_command('gc', '--auto', '--quiet',
+                                                      timeout=PUSH_TIMEOUT)
+        if not success:
+            print(f"⚠️  git gc failed: {error.decode(errors='replace')}")
+    
+    def start_observer(self, check_interval):
+        """Start a native file system observer, polling if the OS API is unavailable"""
+        handler = ChangeHandler(self)
+        try:
+            observer = Observer()
+            observer.schedule(handler, self.watch_directory, recursive=True)
+            observer.start()
+        except OSError as e:
+            # e.g. inotify watch limit reached
+            print(f"⚠️  Native file watching unavailable ({e}), polling instead")
+            observer = PollingObserver(timeout=check_interval)
+            observer.schedule(handler, self.watch_directory, recursive=True)
+            observer.start()
+        return observer
+    
+    def watch(self, check_interval=5, max_interval=60):
         """Watch for file changes"""
         print("🔄 Real-time GitHub Sync Started")
         print("=" * 40)
-        print(f"📁 Watching: {self.watch_directory.absolute()}")
+        print(f"📁 Watching: {self.watch_directory}")
         print(f"🔗 Repository: https://github.com/Sourabhsingh28bais/ai-trading-dashboardd")
-        print(f"⏱️  Check interval: {check_interval} seconds")
+        
+        if Observer is None:
+            print("⚠️  watchdog not installed (pip install watchdog), falling back to polling")
+            self.poll(check_interval, max_interval)
+            return
+        
+        observer = self.start_observer(check_interval)
+        print("👀 Listening for file system events")
+        print("⏹️  Press Ctrl+C to stop\n")
+        
+        try:
+            while True:
+                try:
+                    # Short timeout keeps Ctrl+C responsive on Windows
+                    first = self.events.get(timeout=1)
+                except queue.Empty:
+                    continue
+                
+                # Coalesce the burst (save-all, formatter, git pull) into one sync
+                self.pending.add(first)
+                deadline = time.monotonic() + self.max_wait
+                while time.monotonic() < deadline:
+                    try:
+                        self.pending.add(self.events.get(timeout=self.debounce))
+                    except queue.Empty:
+                        break
+                
+                self.drop_gitignored(self.pending)
+                changed_files = {}
+                for rel_path in self.pending:
+                    changed, digest = self.check_content(rel_path)
+                    if changed:
+                        changed_files[rel_path] = digest
+                self.pending.clear()
+                if changed_files:
+                    self.submit_sync(changed_files)
+                self.compact_paths()
+                
+        except KeyboardInterrupt:
+            print("\n⏹️  Real-time sync stopped")
+        finally:
+            observer.stop()
+            observer.join()
+            self.shutdown()
+    
+    def poll(self, check_interval=5, max_interval=60):
+        """Poll the tree for file changes (fallback when watchdog is missing)
+        
+        The wait doubles after every idle scan (up to max_interval) and drops
+        back to check_interval as soon as a change is seen.
+        """
+        max_interval = max(check_interval, max_interval)
+        print(f"⏱️  Check interval: {check_interval}-{max_interval} seconds")
         print("⏹️  Press Ctrl+C to stop\n")
         
         # Initial scan
-        self.last_modified = self.get_file_times()
-        print(f"📊 Monitoring {len(self.last_modified)} files")
+        self.scan_changes()
+        print(f"📊 Monitoring {np.count_nonzero(self.mtimes != MISSING)} files")
         
+        interval = check_interval
         try:
             while True:
-                current_times = self.get_file_times()
-                changed_files = []
-                
-                # Check for changes
-                for file_path, mod_time in current_times.items():
-                    if (file_path not in self.last_modified or 
-                        self.last_modified[file_path] != mod_time):
-                        changed_files.append(file_path)
+                changed_files = self.scan_changes()
                 
-                # Check for deleted files
-                for file_path in self.last_modified:
-                    if file_path not in current_times:
-                        changed_files.append(f"{file_path} (deleted)")
+                if changed_files:
+                    # Only hash files whose mtime moved
+                    changes = {}
+                    for rel_path in changed_files:
+                        changed, digest = self.check_content(rel_path)
+                        if changed:
+                            changes[rel_path] = digest
+                    changed_files = changes
                 
                 if changed_files:
-                    self.sync_to_github(changed_files)
-                    self.last_modified = current_times
+                    self.submit_sync(changed_files)
+                    interval = check_interval
+                else:
+                    interval = min(interval * 2, max_interval)
+                self.compact_paths()
                 
-                time.sleep(check_interval)
+                time.sleep(interval)
                 
         except KeyboardInterrupt:
             print("\n⏹️  Real-time sync stopped")
+        finally:
+            self.shutdown()
 
 if __name__ == "__main__":
-    import sys
+    import argparse
     
-    interval = 5  # Default 5 seconds
-    if len(sys.argv) > 1:
-        try:
-            interval = int(sys.argv[1])
-        except ValueError:
-            print("❌ Invalid interval. Using default 5 seconds.")
+    parser = argparse.ArgumentParser(description="Sync file changes to GitHub in real time")
+    parser.add_argument("interval", nargs="?", type=int, default=5,
+                        help="Shortest polling interval in seconds when watchdog is unavailable (default: 5)")
+    parser.add_argument("--max", dest="max_interval", type=int, default=60,
+                        help="Longest polling interval while the tree is idle (default: 60)")
+    args = parser.parse_args()
+    if min(args.interval, args.max_interval) < 1:
+        parser.error("intervals must be at least 1 second")
     
     watcher = FileWatcher()
-    watcher.watch(interval)
\ No newline at end of file
+    watcher.watch(args.interval, args.max_interval)
@@ -12,6 +12,9 @@ git config --global push.default simple
 
 echo ✅ Git configuration complete!
 echo.
+echo 📦 Sync script dependencies (numpy for realtime_sync.py, plus optional speedups):
+echo    pip install -r requirements-sync.txt
+echo.
 echo 🔄 Available sync options:
 echo.
 echo 1. Manual Sync (run when needed):
@@ -21,7 +24,8 @@ echo 2. Auto Sync (runs continuously):
 echo    python auto_sync.py
 echo.
 echo 3. Auto Sync with custom interval:
-echo    python auto_sync.py 60    (checks every 60 seconds)
+echo    python auto_sync.py 60    (checks every 60 seconds, backing off while idle)
+echo    python auto_sync.py --min 10 --max 120
 echo.
 echo 🔗 Your repository: https://github.com/Sourabhsingh28bais/ai-trading-dashboardd
 echo.
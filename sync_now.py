@@ -3,16 +3,26 @@
 Quick sync script - Run this to immediately sync changes to GitHub
 """
 
+import os
 import subprocess
-from datetime import datetime
+import time
 
-def run_command(command):
-    """Run a shell command and return the result"""
+# Read-only git calls skip the optional index refresh (and its lock)
+READ_ONLY_ENV = {'GIT_OPTIONAL_LOCKS': '0'}
+
+# Commit message template, filled with a `%Y-%m-%d %H:%M:%S` timestamp and
+# piped to `git commit -F -`
+COMMIT_MESSAGE = b"Quick sync: Trading dashboard updates - %s"
+
+def run_command(args, env=None, input=None):
+    """Run a command (argv list, no shell) and return the result"""
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
+        # Output stays bytes; only decode what gets printed
+        result = subprocess.run(args, input=input, capture_output=True,
+                                env=env and {**os.environ, **env})
         return result.returncode == 0, result.stdout, result.stderr
     except Exception as e:
-        return False, "", str(e)
+        return False, b"", str(e).encode()
 
 def quick_sync():
     """Quickly commit and push all changes"""
@@ -20,36 +30,35 @@ def quick_sync():
     print("=" * 30)
     
     # Check for changes
-    success, output, error = run_command("git status --porcelain")
-    if not success or output.strip() == "":
+    success, output, error = run_command(['git', 'status', '--porcelain'], READ_ONLY_ENV)
+    if not success or not output.strip():
         print("✅ No changes to sync")
         return
     
     print("📝 Changes found:")
-    print(output)
+    print(output.decode(errors='replace'))
     
     # Add all changes
     print("📦 Adding changes...")
-    success, output, error = run_command("git add .")
+    success, output, error = run_command(['git', 'add', '.'])
     if not success:
-        print(f"❌ Failed to add: {error}")
+        print(f"❌ Failed to add: {error.decode(errors='replace')}")
         return
     
     # Commit
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    commit_message = f"Quick sync: Trading dashboard updates - {timestamp}"
+    commit_message = COMMIT_MESSAGE % time.strftime("%Y-%m-%d %H:%M:%S").encode()
     
     print("💾 Committing...")
-    success, output, error = run_command(f'git commit -m "{commit_message}"')
+    success, output, error = run_command(['git', 'commit', '-F', '-'], input=commit_message)
     if not success:
-        print(f"❌ Failed to commit: {error}")
+        print(f"❌ Failed to commit: {error.decode(errors='replace')}")
         return
     
     # Push
     print("🚀 Pushing to GitHub...")
-    success, output, error = run_command("git push origin main")
+    success, output, error = run_command(['git', 'push', 'origin', 'main'])
     if not success:
-        print(f"❌ Failed to push: {error}")
+        print(f"❌ Failed to push: {error.decode(errors='replace')}")
         return
     
     print("✅ Successfully synced to GitHub!")